@@ -0,0 +1,39 @@
+import hashlib
+import re
+import sqlite3
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+class ClassificationCache:
+    """
+    Cache of commit classifications, persisted to SQLite.
+
+    Lookups are keyed by a hash of (namespace, survey, normalized commit message), so
+    near-duplicate messages that differ only in case, whitespace or trailing punctuation
+    ("Fix typo", "fix typo.") share a single entry.
+
+    Args:
+        path (str): Path of the SQLite database file.
+    """
+    def __init__(self, path: str = "cache.sqlite"):
+        self.con = sqlite3.connect(path)
+        self.con.execute("CREATE TABLE IF NOT EXISTS labels (hash TEXT PRIMARY KEY, label TEXT NOT NULL)")
+        self._exact = dict(self.con.execute("SELECT hash, label FROM labels"))
+
+    @staticmethod
+    def _normalize(commit_message: str) -> str:
+        return _WHITESPACE_RE.sub(" ", commit_message).strip().rstrip(".!").lower()
+
+    def key(self, namespace: str, survey: str, commit_message: str) -> str:
+        raw = "\x00".join((namespace, survey, self._normalize(commit_message)))
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+    def get(self, namespace: str, survey: str, commit_message: str) -> str | None:
+        return self._exact.get(self.key(namespace, survey, commit_message))
+
+    def set(self, namespace: str, survey: str, commit_message: str, label: str):
+        h = self.key(namespace, survey, commit_message)
+        self._exact[h] = label
+        with self.con:
+            self.con.execute("INSERT OR REPLACE INTO labels (hash, label) VALUES (?, ?)", (h, label))
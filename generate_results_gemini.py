@@ -1,4 +1,9 @@
-from google.generativeai import GenerativeModel, configure
+from google.generativeai import GenerationConfig, GenerativeModel, configure
+from aiolimiter import AsyncLimiter
+from classification_cache import ClassificationCache
+from functools import lru_cache
+from itertools import islice
+import asyncio
 import os
 import json
 
@@ -6,51 +11,217 @@ import json
 with open("config.json", "r") as f:
     config = json.load(f)
 token = config.get("google_token")
+# The default gRPC transport keeps a single HTTP/2 channel open for all requests
 configure(api_key=os.environ.get(token))
 
-# Initialize the Gemini 2.0 Flash-Lite model
-model = GenerativeModel("gemini-2.0-flash-lite")
+# Gemini 2.0 Flash-Lite; one model per survey is built by _model_for_survey
+MODEL_NAME = "gemini-2.0-flash-lite"
+
+# Previously seen (survey, commit message) pairs are answered from here
+cache = ClassificationCache()
 
 # Define the classification categories
 categories = ["Corrective", "Adaptive", "Perfective", "Preventive", "Development"]
+_category_set = set(categories)
 
-def classify_commit(survey_result, commit_message):
-    """Classifies a commit message based on a survey result."""
-    prompt = f"""You are an expert at classifying software development commits based on a survey result and the commit message.
+# Constrained decoding: a single answer can only be one of the categories,
+# a batch answer only a JSON array of {i, label} objects with such labels
+_SINGLE_CONFIG = GenerationConfig(
+    response_mime_type="text/x.enum",
+    response_schema={"type": "STRING", "enum": categories}
+)
+_BATCH_CONFIG = GenerationConfig(
+    response_mime_type="application/json",
+    response_schema={
+        "type": "ARRAY",
+        "items": {
+            "type": "OBJECT",
+            "properties": {
+                "i": {"type": "INTEGER"},
+                "label": {"type": "STRING", "enum": categories}
+            },
+            "required": ["i", "label"]
+        }
+    }
+)
+
+def _build_system_instruction(survey_result):
+    """Builds the static part of the prompt, shared by every commit of a survey."""
+    return f"""You are an expert at classifying software development commits based on a survey result and the commit message.
     Classify the following commit message into one of these categories: {', '.join(categories)}.
     Provide your answer as a single word representing the category.
 
     Survey Result:
     {survey_result}
+    """
 
-    Commit Message:
+def _build_prompt(commit_message):
+    """Builds the per-commit part of the prompt."""
+    return f"""Commit Message:
     {commit_message}
 
     Classification:
     """
+
+@lru_cache(maxsize=None)
+def _model_for_survey(survey_result):
+    """
+    Returns a model carrying the instructions and survey as its system instruction,
+    so each request only adds the commit message. The survey prefix is far below
+    Gemini's minimum size for explicit context caching, so no CachedContent is used.
+    """
+    return GenerativeModel(MODEL_NAME, system_instruction=_build_system_instruction(survey_result))
+
+def _build_batch_prompt(commit_messages):
+    """Builds the per-batch part of the prompt for several numbered commits."""
+    numbered = "\n".join(f"{i}. {msg}" for i, msg in enumerate(commit_messages, start=1))
+    return f"""Classify each of the following numbered commit messages instead of a single one.
+    Answer with one object per commit, e.g. [{{"i": 1, "label": "{categories[0]}"}}].
+
+    Commit Messages:
+    {numbered}
+    """
+
+def _parse_batch_classification(response, n):
+    """
+    Parses a batch answer into a list of n categories.
+    Raises ValueError when the answer is malformed or incomplete (e.g. truncated).
+    """
+    labels = {int(item["i"]): item["label"] for item in json.loads(response.text)}
+    if set(labels) != set(range(1, n + 1)):
+        raise ValueError(f"expected {n} labels, got {len(labels)}")
+    return [labels[i] for i in range(1, n + 1)]
+
+def _parse_classification(response):
+    """Extracts the category from a model response."""
+    if response.text:
+        return response.text.strip()
+    else:
+        return "No response"
+
+def classify_commit(survey_result, commit_message):
+    """Classifies a commit message based on a survey result."""
+    cached = cache.get(MODEL_NAME, survey_result, commit_message)
+    if cached is not None:
+        return cached
+    prompt = _build_prompt(commit_message)
     try:
-        response = model.generate_content([prompt])
-        if response.text:
-            # Extract the first word as the classification
-            classification = response.text.strip().split()[0]
-            if classification in categories:
-                return classification
-            else:
-                return "Unknown"
-        else:
-            return "No response"
+        response = _model_for_survey(survey_result).generate_content([prompt], generation_config=_SINGLE_CONFIG)
+        classification = _parse_classification(response)
+        if classification in _category_set:
+            cache.set(MODEL_NAME, survey_result, commit_message, classification)
+        return classification
     except Exception as e:
         print(f"Error during classification: {e}")
         return "Error"
 
-def classify_multiple_commits(commits_data, sample_survey_result):
-    """Classifies a list of commits."""
+async def classify_commit_async(semaphore, limiter, survey_result, commit_message):
+    """Async variant of classify_commit, bounded by a semaphore and a rate limiter."""
+    cached = cache.get(MODEL_NAME, survey_result, commit_message)
+    if cached is not None:
+        return cached
+    prompt = _build_prompt(commit_message)
+    async with semaphore:
+        async with limiter:
+            try:
+                response = await _model_for_survey(survey_result).generate_content_async(
+                    [prompt], generation_config=_SINGLE_CONFIG
+                )
+                classification = _parse_classification(response)
+                if classification in _category_set:
+                    cache.set(MODEL_NAME, survey_result, commit_message, classification)
+                return classification
+            except Exception as e:
+                print(f"Error during classification: {e}")
+                return "Error"
+
+async def classify_batch_async(semaphore, limiter, survey_result, commit_messages):
+    """
+    Classifies several commit messages with a single request.
+    If the answer is malformed or truncated, the batch is split in half and retried;
+    if the request itself fails, the whole batch is marked "Error".
+    """
     results = {}
-    for commit_message in commits_data:
-        classification = classify_commit(sample_survey_result, commit_message)
+    pending = []
+    for commit_message in commit_messages:
+        cached = cache.get(MODEL_NAME, survey_result, commit_message)
+        if cached is not None:
+            results[commit_message] = cached
+        else:
+            pending.append(commit_message)
+    if len(pending) == 1:
+        results[pending[0]] = await classify_commit_async(semaphore, limiter, survey_result, pending[0])
+    if len(pending) <= 1:
+        return results
+
+    prompt = _build_batch_prompt(pending)
+    async with semaphore:
+        async with limiter:
+            try:
+                response = await _model_for_survey(survey_result).generate_content_async(
+                    [prompt], generation_config=_BATCH_CONFIG
+                )
+            except Exception as e:
+                print(f"Error during classification: {e}")
+                results.update(dict.fromkeys(pending, "Error"))
+                return results
+            try:
+                classifications = _parse_batch_classification(response, len(pending))
+            except (ValueError, KeyError) as e:
+                # JSONDecodeError is a ValueError, as is reading a truncated or blocked response
+                print(f"Batch of {len(pending)} failed, retrying in halves: {e}")
+                classifications = None
+    if classifications is None:
+        mid = len(pending) // 2
+        halves = await asyncio.gather(
+            classify_batch_async(semaphore, limiter, survey_result, pending[:mid]),
+            classify_batch_async(semaphore, limiter, survey_result, pending[mid:])
+        )
+        for half in halves:
+            results.update(half)
+        return results
+
+    for commit_message, classification in zip(pending, classifications):
+        if classification in _category_set:
+            cache.set(MODEL_NAME, survey_result, commit_message, classification)
         results[commit_message] = classification
     return results
 
+async def classify_multiple_commits(commits_data, sample_survey_result, batch_size=20, concurrency=32, requests_per_minute=500):
+    """
+    Classifies a list of commits concurrently, packing up to `batch_size` commits per request.
+
+    At most `concurrency` requests are in flight at once and no more than
+    `requests_per_minute` are started per minute (the provider QPM quota).
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    limiter = AsyncLimiter(requests_per_minute, 60)
+    unique_commits = iter(dict.fromkeys(commits_data))
+    batches = list(iter(lambda: list(islice(unique_commits, batch_size)), []))
+    tasks = [
+        classify_batch_async(semaphore, limiter, sample_survey_result, batch)
+        for batch in batches
+    ]
+    batch_results = await asyncio.gather(*tasks, return_exceptions=True)
+    results = {}
+    for batch, classifications in zip(batches, batch_results):
+        if isinstance(classifications, BaseException):
+            print(f"Error during classification: {classifications}")
+            classifications = dict.fromkeys(batch, "Error")
+        results.update(classifications)
+    return results
+
+async def classify_commits_df(commits_df, sample_survey_result, **kwargs):
+    """
+    Classifies the commits DataFrame returned by GitHubCommitCollector.collect_commits.
+    Each distinct message (by msg_hash) is classified once and the label joined back
+    onto every row as a `classification` column. Extra kwargs go to classify_multiple_commits.
+    """
+    unique_msgs = commits_df.drop_duplicates('msg_hash')[['msg_hash', 'message']]
+    classified = await classify_multiple_commits(unique_msgs['message'].tolist(), sample_survey_result, **kwargs)
+    labels = unique_msgs.assign(classification=unique_msgs['message'].map(classified))[['msg_hash', 'classification']]
+    return commits_df.merge(labels, on='msg_hash', how='left')
+
 if __name__ == "__main__":
     # Example usage:
     sample_survey = """
@@ -71,7 +242,7 @@ if __name__ == "__main__":
         "Chore: Upgrade react-router-dom dependency to the latest version."
     ]
 
-    classified_commits = classify_multiple_commits(list_of_commits, sample_survey)
+    classified_commits = asyncio.run(classify_multiple_commits(list_of_commits, sample_survey))
 
     for commit, classification in classified_commits.items():
         print(f"Commit: '{commit}' -> Classification: {classification}")
\ No newline at end of file
@@ -1,12 +1,49 @@
-import openai
+from openai import AsyncOpenAI, OpenAI, RateLimitError
+from classification_cache import ClassificationCache
+import asyncio
+import httpx
 import json
 
 
 with open("config.json", "r") as f:
     config = json.load(f)
-openai.api_key = config.get("openai_token")
+# Clients share pooled HTTP/2 connections, so repeated calls reuse the same TLS session
+_limits = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+client = OpenAI(
+    api_key=config.get("openai_token"),
+    http_client=httpx.Client(http2=True, limits=_limits)
+)
+async_client = AsyncOpenAI(
+    api_key=config.get("openai_token"),
+    http_client=httpx.AsyncClient(http2=True, limits=_limits)
+)
 
-# static survey
+# Previously seen commit messages are answered from here
+cache = ClassificationCache()
+
+# Cached prompt tokens reported by the API, see _record_usage
+usage_stats = {"prompt_tokens": 0, "cached_tokens": 0}
+
+CATEGORIES = ["Corrective", "Adaptive", "Perfective", "Preventive", "Development"]
+
+# Structured output: the answer is constrained to {"label": <one of CATEGORIES>}.
+# Strict schemas need an object at the root, so the label is wrapped in one.
+RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "label",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {"label": {"type": "string", "enum": CATEGORIES}},
+            "required": ["label"],
+            "additionalProperties": False
+        }
+    }
+}
+
+# static survey. It is always sent as the first (system) message so that, once it
+# reaches 1024 tokens, OpenAI's automatic prompt caching reuses it across requests.
 SURVEY_TEXT = """
 You are an expert in software maintenance. Classify commit messages into one of the following categories:
 
@@ -27,27 +64,89 @@ Respond using only ONE word. Below is the guiding survey used internally by the
 [... continue up to question 30 ...]
 """
 
-def classify_commit(commit_message: str, model: str = "gpt-4o") -> str:
-    """
-    Classify a commit message into one of five software maintenance categories.
-    """
-    messages = [
+def _build_messages(commit_message: str) -> list[dict]:
+    return [
         {"role": "system", "content": SURVEY_TEXT},
         {"role": "user", "content": f"Commit: {commit_message}"}
     ]
 
+def _parse_label(response) -> str:
+    return json.loads(response.choices[0].message.content)["label"]
+
+def _record_usage(response):
+    usage = response.usage
+    if usage is None:
+        return
+    usage_stats["prompt_tokens"] += usage.prompt_tokens
+    details = usage.prompt_tokens_details
+    if details is not None and details.cached_tokens:
+        usage_stats["cached_tokens"] += details.cached_tokens
+
+def classify_commit(commit_message: str, model: str = "gpt-4o") -> str:
+    """
+    Classify a commit message into one of five software maintenance categories.
+    """
+    cached = cache.get(model, SURVEY_TEXT, commit_message)
+    if cached is not None:
+        return cached
     try:
-        response = openai.ChatCompletion.create(
+        response = client.chat.completions.create(
             model=model,
-            messages=messages,
-            temperature=0  # deterministic output
+            messages=_build_messages(commit_message),
+            temperature=0,  # deterministic output
+            response_format=RESPONSE_FORMAT,
+            max_tokens=10
         )
-        classification = response['choices'][0]['message']['content'].strip()
+        _record_usage(response)
+        classification = _parse_label(response)
+        cache.set(model, SURVEY_TEXT, commit_message, classification)
         return classification
     except Exception as e:
         print("Error:", e)
         return "Error"
 
+async def classify_commit_async(
+    commit_message: str,
+    semaphore: asyncio.Semaphore,
+    model: str = "gpt-4o",
+    max_retries: int = 5
+) -> str:
+    """
+    Async variant of classify_commit. Retries with exponential backoff on rate limiting.
+    """
+    cached = cache.get(model, SURVEY_TEXT, commit_message)
+    if cached is not None:
+        return cached
+    async with semaphore:
+        for attempt in range(max_retries):
+            try:
+                response = await async_client.chat.completions.create(
+                    model=model,
+                    messages=_build_messages(commit_message),
+                    temperature=0,  # deterministic output
+                    response_format=RESPONSE_FORMAT,
+                    max_tokens=10
+                )
+                _record_usage(response)
+                classification = _parse_label(response)
+                cache.set(model, SURVEY_TEXT, commit_message, classification)
+                return classification
+            except RateLimitError as e:
+                if attempt == max_retries - 1:
+                    print("Error:", e)
+                    return "Error"
+                await asyncio.sleep(2 ** attempt)
+            except Exception as e:
+                print("Error:", e)
+                return "Error"
+
+async def classify_many(commits: list[str], concurrency: int = 50, model: str = "gpt-4o") -> list[str]:
+    """
+    Classify a list of commit messages concurrently, keeping at most `concurrency` requests in flight.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    return await asyncio.gather(*[classify_commit_async(c, semaphore, model) for c in commits])
+
 # Example usage
 if __name__ == "__main__":
     commits = [
@@ -58,6 +157,7 @@ if __name__ == "__main__":
         "Build new onboarding flow for merchants"
     ]
 
-    for commit in commits:
-        result = classify_commit(commit)
+    results = asyncio.run(classify_many(commits))
+    for commit, result in zip(commits, results):
         print(f"Commit: {commit}\n→ Category: {result}\n")
+    print(f"Prompt tokens: {usage_stats['prompt_tokens']}, cached: {usage_stats['cached_tokens']}")
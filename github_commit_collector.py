@@ -1,10 +1,119 @@
+import asyncio
+import hashlib
+import queue
 import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from collections import Counter, defaultdict
+import aiohttp
 import pandas as pd
-from github import Github, Repository
+import pyarrow as pa
+import pyarrow.parquet as pq
+from github import Github
 import json
 import tqdm
+import tqdm.asyncio
+
+_WORD_RE = re.compile(r"\w+")
+_SINCE = datetime(2024,1,1, tzinfo=timezone.utc)
+_UNTIL = datetime(2025,1,1, tzinfo=timezone.utc)
+_GRAPHQL_URL = "https://api.github.com/graphql"
+# Repo metadata plus the first page of its 2024 commit history, for a page of search results
+_SEARCH_QUERY = """
+query($q: String!, $first: Int!, $cursor: String, $since: GitTimestamp!, $until: GitTimestamp!) {
+  search(query: $q, type: REPOSITORY, first: $first, after: $cursor) {
+    pageInfo { hasNextPage endCursor }
+    nodes {
+      ... on Repository {
+        nameWithOwner
+        name
+        owner { login }
+        description
+        isFork
+        diskUsage
+        pushedAt
+        defaultBranchRef {
+          target {
+            ... on Commit {
+              history(since: $since, until: $until, first: 100) {
+                totalCount
+                pageInfo { hasNextPage endCursor }
+                nodes { committedDate message }
+              }
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+# A page of a single repo's 2024 commit history, for both validation and collect_commits
+_HISTORY_QUERY = """
+query($owner: String!, $name: String!, $since: GitTimestamp!, $until: GitTimestamp!, $cursor: String) {
+  repository(owner: $owner, name: $name) {
+    defaultBranchRef {
+      target {
+        ... on Commit {
+          history(since: $since, until: $until, first: 100, after: $cursor) {
+            totalCount
+            pageInfo { hasNextPage endCursor }
+            nodes { oid committedDate authoredDate message author { name } }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+_PR_SCHEMA = pa.schema([
+    ('repo_full_name', pa.string()),
+    ('pr_number', pa.int64()),
+    ('title', pa.string()),
+    ('body', pa.string()),
+    ('author', pa.string()),
+    ('created_at', pa.timestamp('s', tz='UTC')),
+    ('state', pa.string()),
+    ('merged', pa.bool_())
+])
+
+def _message_hash(message: str) -> str:
+    return hashlib.blake2b(message.encode("utf-8"), digest_size=8).hexdigest()
+
+def _utc_isoformat(timestamp: str) -> str:
+    """
+    Normalize a GitTimestamp, which keeps the committer's offset, to a UTC ISO string.
+    """
+    return datetime.fromisoformat(timestamp.replace("Z", "+00:00")).astimezone(timezone.utc).isoformat()
+
+def _history(repo: dict) -> dict | None:
+    """
+    The 2024 commit history connection of a repo node, or None for an empty repo.
+    """
+    branch = repo["defaultBranchRef"]
+    return branch["target"]["history"] if branch else None
+
+class _ActivityTally:
+    """
+    Running commit count, word count and active-week bitmask over a repo's 2024 commits.
+    """
+    def __init__(self):
+        self.commits = 0
+        self.words = 0
+        # One bit per ISO week, taken from the commit date, which history(since, until) keeps
+        # within 2024 (UTC). Bits 1-52 are the ISO weeks of 2024; Dec 30-31 fall in ISO week 1
+        # of 2025 and get bit 0, so they are not counted as the first week of 2024
+        self.week_mask = 0
+
+    def add(self, committed_date: str, message: str):
+        d = datetime.fromisoformat(committed_date.replace("Z", "+00:00")).astimezone(timezone.utc)
+        self.commits += 1
+        iso = d.isocalendar()
+        self.week_mask |= 1 << (iso.week if iso.year == 2024 else 0)
+        self.words += sum(1 for _ in _WORD_RE.finditer(message))
 
 class GitHubCommitCollector:
     """
@@ -17,6 +126,9 @@ class GitHubCommitCollector:
         min_avg_words (int): Minimum average word count per commit message.
         exclusion_keywords (list[str]): Repo names or descriptions containing any of these will be excluded.
         exclude_forks (bool): Whether to exclude forked repositories.
+        cache_path (str): SQLite file caching repo validation results between runs.
+        cache_ttl (int): Seconds a cached validation result stays valid.
+        db_path (str): SQLite file storing collected commits, so reruns only fetch newer ones.
     """
     def __init__(
         self,
@@ -25,7 +137,10 @@ class GitHubCommitCollector:
         min_active_weeks: int = 5,
         min_avg_words: int = 5,
         exclusion_keywords: list[str] = None,
-        exclude_forks: bool = True
+        exclude_forks: bool = True,
+        cache_path: str = ".repo_cache.sqlite",
+        cache_ttl: int = 7 * 86400,
+        db_path: str = "commits.db"
     ):
         with open(config_path, "r") as f:
             config = json.load(f)
@@ -33,125 +148,419 @@ class GitHubCommitCollector:
         if not token:
             raise ValueError("GitHub token not found in config file.")
 
-        self.g = Github(token)
+        self.token = token
+        # 100 is the largest page GitHub serves; PyGithub's default of 30 triples the requests
+        self.g = Github(token, per_page=100)
         self.min_commits_2024 = min_commits_2024
         self.min_active_weeks = min_active_weeks
         self.min_avg_words = min_avg_words
         self.exclusion_keywords = exclusion_keywords or ["student", "exercise", "tutorial"]
         self.exclude_forks = exclude_forks
+        # All keywords in one alternation, so each repo text is scanned once
+        self._exclusion_re = re.compile("|".join(re.escape(kw.lower()) for kw in self.exclusion_keywords))
         self.repos = None
         self.valid_repos = None
+        self.cache_ttl = cache_ttl
+        self.cache = sqlite3.connect(cache_path)
+        self.cache.execute(
+            "CREATE TABLE IF NOT EXISTS repo_validity (key TEXT PRIMARY KEY, valid INTEGER NOT NULL, expires REAL NOT NULL)"
+        )
+        self.db = sqlite3.connect(db_path)
+        with self.db:
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS commits "
+                "(repo TEXT, sha TEXT, author TEXT, date TEXT, committed_date TEXT, message TEXT, PRIMARY KEY (repo, sha))"
+            )
+            self.db.execute("CREATE TABLE IF NOT EXISTS repo_state (repo TEXT PRIMARY KEY, last_sha TEXT, last_date TEXT)")
 
-    def search_repos(self, query: str, per_page: int = 50, max_pages: int = 2) -> list[Repository.Repository]:
+    def search_repos(self, query: str, per_page: int = 50, max_pages: int = 2) -> list[dict]:
         """
-        Search GitHub repositories by a query string.
+        Search GitHub repositories by a query string, most starred first.
+        Uses one GraphQL request per page; each returned repo node already carries its
+        metadata and the first 100 commits of 2024, see _SEARCH_QUERY.
         """
+        return asyncio.run(self._search_repos_async(query, per_page, max_pages))
+
+    async def _search_repos_async(self, query: str, per_page: int, max_pages: int) -> list[dict]:
         repos = []
-        for page in range(1, max_pages + 1):
-            result = self.g.search_repositories(query, 'stars', 'desc')[page*per_page - per_page: page*per_page]
-            repos.extend(result)
+        variables = {
+            "q": f"{query} sort:stars-desc",
+            "first": per_page,
+            "cursor": None,
+            "since": _SINCE.isoformat(),
+            "until": _UNTIL.isoformat()
+        }
+        async with self._session() as session:
+            for _ in range(max_pages):
+                search = (await self._graphql(session, _SEARCH_QUERY, variables))["search"]
+                # Non-repository results come back as empty nodes
+                repos.extend(node for node in search["nodes"] if node)
+                if not search["pageInfo"]["hasNextPage"]:
+                    break
+                variables["cursor"] = search["pageInfo"]["endCursor"]
         return repos
 
-    def _repo_is_valid(self, repo: Repository.Repository) -> bool:
+    def _passes_repo_filters(self, repo: dict) -> bool:
         """
-        Apply fork, keyword and commit-activity filters to a single repo.
+        Apply the fork and keyword filters, which only need the repo metadata.
         """
         # Exclude forks
-        if self.exclude_forks and repo.fork:
-            print(f"Excluding forked repo: {repo.full_name}")
+        if self.exclude_forks and repo["isFork"]:
+            print(f"Excluding forked repo: {repo['nameWithOwner']}")
             return False
         # Exclude academic or tutorial repos
-        text = (repo.name + ' ' + (repo.description or '')).lower()
-        if any(kw.lower() in text for kw in self.exclusion_keywords):
-            print(f"Excluding repo with keywords: {repo.full_name}")
+        text = (repo["name"] + ' ' + (repo["description"] or '')).lower()
+        if self._exclusion_re.search(text):
+            print(f"Excluding repo with keywords: {repo['nameWithOwner']}")
             return False
+        return True
 
-        # Analyze commits in 2024
-        commit_dates = []
-        messages = []
-
-        for commit in tqdm.tqdm(repo.get_commits(since=datetime(2024,1,1, tzinfo=timezone.utc), until=datetime(2025,1,1, tzinfo=timezone.utc)), desc=f"Analyzing commits in {repo.full_name}", unit="commit"):
-            commit_dates.append(commit.commit.author.date)
-            messages.append(commit.commit.message)
-        total_commits = len(commit_dates)
-        if total_commits < self.min_commits_2024:
+    def _scan_history(self, history: dict | None, tally: _ActivityTally) -> bool | None:
+        """
+        Add one page of commit history to the tally.
+        Returns True/False once the commit-activity filters are decided, or None if the next page is needed.
+        """
+        if history is None or history["totalCount"] < self.min_commits_2024:
             return False
+        for node in history["nodes"]:
+            tally.add(node["committedDate"], node["message"])
+            # Stop paging as soon as every threshold holds for the commits seen so far
+            if self._meets_thresholds(tally):
+                return True
+        return None if history["pageInfo"]["hasNextPage"] else False
 
-        # Count active weeks
-        weeks = set((d.isocalendar()[1], d.year) for d in commit_dates)
-        if len(weeks) < self.min_active_weeks:
+    def _repo_is_valid(self, repo: dict, tally: _ActivityTally = None) -> bool | None:
+        """
+        Apply fork, keyword and commit-activity filters to a single search result, in pure Python
+        over the history fetched with it. Returns None when that first page is not enough to decide.
+        """
+        if not self._passes_repo_filters(repo):
             return False
+        return self._scan_history(_history(repo), tally or _ActivityTally())
 
-        # Average words per commit
-        avg_words = sum(len(re.findall(r"\w+", msg)) for msg in messages) / max(total_commits, 1)
-        if avg_words < self.min_avg_words:
-            return False
+    async def _repo_is_valid_async(
+        self,
+        session: aiohttp.ClientSession,
+        semaphore: asyncio.Semaphore,
+        repo: dict
+    ) -> bool | None:
+        """
+        Complete _repo_is_valid for repos it cannot decide, fetching further pages of the
+        2024 commit history through the GraphQL API, 100 dates and messages at a time.
+        Returns None if the history could not be fetched.
+        """
+        tally = _ActivityTally()
+        verdict = self._repo_is_valid(repo, tally)
+        if verdict is not None:
+            return verdict
 
-        return True
+        history = _history(repo)
+        variables = {
+            "owner": repo["owner"]["login"],
+            "name": repo["name"],
+            "since": _SINCE.isoformat(),
+            "until": _UNTIL.isoformat(),
+            "cursor": history["pageInfo"]["endCursor"]
+        }
+        try:
+            async with semaphore:
+                while verdict is None:
+                    data = await self._graphql(session, _HISTORY_QUERY, variables)
+                    history = _history(data["repository"])
+                    verdict = self._scan_history(history, tally)
+                    if verdict is None:
+                        variables["cursor"] = history["pageInfo"]["endCursor"]
+            return verdict
+        except (aiohttp.ClientError, asyncio.TimeoutError, RuntimeError) as e:
+            print(f"Failed to analyze commits of {repo['nameWithOwner']}: {e}")
+            return None
 
-    def filter_repos(self, repos: list[Repository.Repository]) -> list[Repository.Repository]:
+    def _session(self) -> aiohttp.ClientSession:
+        headers = {"Authorization": f"Bearer {self.token}"}
+        return aiohttp.ClientSession(headers=headers, connector=aiohttp.TCPConnector(limit=16))
+
+    async def _graphql(self, session: aiohttp.ClientSession, query: str, variables: dict) -> dict:
+        """
+        Run a GraphQL query and return its data, raising RuntimeError on GraphQL errors.
+        """
+        async with session.post(_GRAPHQL_URL, json={"query": query, "variables": variables}) as resp:
+            resp.raise_for_status()
+            payload = await resp.json()
+        if payload.get("errors"):
+            raise RuntimeError(payload["errors"][0].get("message", "GraphQL error"))
+        return payload["data"]
+
+    async def _validate_repos(self, repos: list[dict], concurrency: int) -> list[bool | None]:
+        """
+        Run _repo_is_valid_async over all repos concurrently, at most `concurrency` repos at a time.
+        Results are cached on disk per (repo, pushedAt, filter settings), so a rerun only
+        re-checks repos that were pushed to since, or whose entry expired.
+        """
+        keys = [self._cache_key(repo) for repo in repos]
+        results = [self._cache_get(key) for key in keys]
+        misses = [i for i, result in enumerate(results) if result is None]
+
+        semaphore = asyncio.Semaphore(concurrency)
+        async with self._session() as session:
+            fresh = await tqdm.asyncio.tqdm.gather(
+                *[self._repo_is_valid_async(session, semaphore, repos[i]) for i in misses],
+                desc="Filtering repositories",
+                unit="repo"
+            )
+        with self.cache:
+            for i, result in zip(misses, fresh):
+                results[i] = result
+                if result is not None:
+                    self.cache.execute(
+                        "INSERT OR REPLACE INTO repo_validity (key, valid, expires) VALUES (?, ?, ?)",
+                        (keys[i], int(result), time.time() + self.cache_ttl)
+                    )
+        return results
+
+    def _filter_fingerprint(self) -> str:
+        """
+        Hash of the filter settings, so cached results are not reused after they change.
+        """
+        settings = (
+            self.min_commits_2024,
+            self.min_active_weeks,
+            self.min_avg_words,
+            tuple(self.exclusion_keywords),
+            self.exclude_forks
+        )
+        return hashlib.blake2b(repr(settings).encode("utf-8"), digest_size=8).hexdigest()
+
+    def _cache_key(self, repo: dict) -> str:
+        return f"{repo['nameWithOwner']}\x00{repo['pushedAt']}\x00{self._filter_fingerprint()}"
+
+    def _cache_get(self, key: str) -> bool | None:
+        row = self.cache.execute(
+            "SELECT valid FROM repo_validity WHERE key = ? AND expires > ?", (key, time.time())
+        ).fetchone()
+        return bool(row[0]) if row else None
+
+    def _meets_thresholds(self, tally: _ActivityTally) -> bool:
+        """
+        Check the commit-activity thresholds: commit count, active weeks and average words per commit.
+        """
+        return (
+            tally.commits >= self.min_commits_2024
+            and tally.week_mask.bit_count() >= self.min_active_weeks
+            and tally.words / max(tally.commits, 1) >= self.min_avg_words
+        )
+
+    def filter_repos(self, repos: list[dict], concurrency: int = 8) -> list[dict]:
         """
         Filter a list of repositories based on the configuration.
+        Repos are checked concurrently, `concurrency` at a time.
         """
         valid = []
         seen_signatures = set()
-        # Iterate over repos and apply filters, using tqdm for progress
-        for repo in tqdm.tqdm(repos, desc="Filtering repositories", unit="repo"):
-            if not self._repo_is_valid(repo):
+        results = asyncio.run(self._validate_repos(repos, concurrency))
+        for repo, is_valid in zip(repos, results):
+            if not is_valid:
                 continue
             # Remove duplicates by a simple signature: (name, owner)
-            sig = (repo.full_name, repo.size)
+            sig = (repo["nameWithOwner"], repo["diskUsage"])
             if sig in seen_signatures:
                 continue
             seen_signatures.add(sig)
             valid.append(repo)
         self.valid_repos = valid
 
-    def collect_commits(self) -> pd.DataFrame:
+    async def _fetch_commits(
+        self,
+        session: aiohttp.ClientSession,
+        semaphore: asyncio.Semaphore,
+        full_name: str,
+        since: datetime,
+        pbar: tqdm.tqdm
+    ) -> tuple[str, list[tuple]]:
+        """
+        Fetch a repo's commits from `since` to the end of 2024 through the GraphQL API,
+        as (repo, sha, author, date, committed_date, message) rows built straight from the JSON nodes.
+        `date` is the author date; the history window and `since` apply to the commit date.
+        Returns no rows if the history could not be fully fetched.
+        """
+        owner, name = full_name.split("/", 1)
+        variables = {
+            "owner": owner,
+            "name": name,
+            "since": since.isoformat(),
+            "until": _UNTIL.isoformat(),
+            "cursor": None
+        }
+        rows = []
+        try:
+            async with semaphore:
+                while True:
+                    history = _history((await self._graphql(session, _HISTORY_QUERY, variables))["repository"])
+                    if history is None:
+                        break
+                    for n in history["nodes"]:
+                        rows.append((
+                            full_name,
+                            n["oid"],
+                            n["author"]["name"] if n["author"] else None,
+                            _utc_isoformat(n["authoredDate"]),
+                            _utc_isoformat(n["committedDate"]),
+                            n["message"]
+                        ))
+                    pbar.update(len(history["nodes"]))
+                    if not history["pageInfo"]["hasNextPage"]:
+                        break
+                    variables["cursor"] = history["pageInfo"]["endCursor"]
+        except (aiohttp.ClientError, asyncio.TimeoutError, RuntimeError) as e:
+            # Partial rows would move last_date past the commits that were missed
+            print(f"Failed to retrieve commits from {full_name}: {e}")
+            return full_name, []
+        return full_name, rows
+
+    async def _store_commits(self, concurrency: int):
+        """
+        Fetch the new commits of every valid repo concurrently and store them as each repo completes.
+        """
+        last_dates = dict(self.db.execute("SELECT repo, last_date FROM repo_state"))
+        # On a first run the totals are known from the search results; a rerun only fetches
+        # commits since last_date, so the bar is left unsized. It redraws at most every
+        # half second or 100 commits instead of on every commit
+        if any(repo["nameWithOwner"] in last_dates for repo in self.valid_repos):
+            total = None
+        else:
+            total = sum(_history(repo)["totalCount"] for repo in self.valid_repos)
+        pbar = tqdm.tqdm(total=total, desc="Collecting commits", unit="commit", mininterval=0.5, miniters=100)
+        semaphore = asyncio.Semaphore(concurrency)
+        async with self._session() as session:
+            tasks = []
+            for repo in self.valid_repos:
+                full_name = repo["nameWithOwner"]
+                last_date = last_dates.get(full_name)
+                since = datetime.fromisoformat(last_date) if last_date else _SINCE
+                tasks.append(self._fetch_commits(session, semaphore, full_name, since, pbar))
+            for task in asyncio.as_completed(tasks):
+                full_name, rows = await task
+                if not rows:
+                    continue
+                # Commits come newest first. last_date is a commit date, as `since` filters on those
+                with self.db:
+                    self.db.executemany(
+                        "INSERT OR IGNORE INTO commits (repo, sha, author, date, committed_date, message) VALUES (?, ?, ?, ?, ?, ?)",
+                        rows
+                    )
+                    self.db.execute(
+                        "INSERT OR REPLACE INTO repo_state (repo, last_sha, last_date) VALUES (?, ?, ?)",
+                        (full_name, rows[0][1], max(row[4] for row in rows))
+                    )
+        pbar.close()
+
+    def collect_commits(self, concurrency: int = 8) -> pd.DataFrame:
         """
         Retrieve commit metadata and messages from filtered repos and return as DataFrame.
-        Columns: repo_full_name, commit_sha, author, date, message
-        """
-        data = []
-        for repo in self.valid_repos:
-            for commit in repo.get_commits(since=datetime(2024,1,1, tzinfo=timezone.utc), until=datetime(2025,1,1, tzinfo=timezone.utc)):
-                c = commit.commit
-                data.append({
-                    'repo_full_name': repo.full_name,
-                    'commit_sha': commit.sha,
-                    'author': c.author.name,
-                    'date': c.author.date,
-                    'message': c.message.strip()
-                })
-        df = pd.DataFrame(data)
+        Columns: repo_full_name, commit_sha, author, date, message, msg_hash
+        msg_hash identifies identical messages, so each is classified only once.
+
+        Commits are stored in the SQLite database at db_path. For a repo collected before,
+        only commits since its last stored commit date are fetched; the DataFrame is read back
+        from the database, selecting on commit date like the API does.
+        Up to `concurrency` repos are fetched at once.
+        """
+        asyncio.run(self._store_commits(concurrency))
+
+        repo_names = [repo["nameWithOwner"] for repo in self.valid_repos]
+        df = pd.read_sql(
+            "SELECT repo AS repo_full_name, sha AS commit_sha, author, date, message FROM commits "
+            f"WHERE committed_date >= ? AND committed_date < ? AND repo IN ({','.join('?' * len(repo_names))})",
+            self.db,
+            params=[_SINCE.isoformat(), _UNTIL.isoformat(), *repo_names]
+        )
+        df['date'] = pd.to_datetime(df['date'], utc=True)
+        df['message'] = df['message'].astype("string").str.strip()
+        df['msg_hash'] = df['message'].map(_message_hash)
         return df
 
-    def collect_pull_requests(self, repos: list[Repository.Repository]=None) -> pd.DataFrame:
+    @staticmethod
+    def _put_row(rows: queue.Queue, stop: threading.Event, row: dict | None) -> bool:
+        """
+        Put a row on the queue, waiting while it is full. Returns False once `stop` is set.
+        """
+        while not stop.is_set():
+            try:
+                rows.put(row, timeout=0.5)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _fetch_pull_requests(self, full_name: str, rows: queue.Queue, stop: threading.Event):
+        """
+        Fetch all pull requests of a repo, putting each as a row matching _PR_SCHEMA on `rows`.
+        A None is put once the repo is done, also on failure. Returns early once `stop` is set.
+        """
+        try:
+            pulls = self.g.get_repo(full_name, lazy=True).get_pulls(state='all', sort='created', direction='desc')
+            print(f"Collecting PRs from {full_name}, total PR's: {pulls.totalCount}")
+            for pr in pulls:
+                row = {
+                    'repo_full_name': full_name,
+                    'pr_number': pr.number,
+                    'title': pr.title,
+                    'body': pr.body or '',
+                    'author': pr.user.login if pr.user else 'unknown',
+                    'created_at': pr.created_at,
+                    'state': pr.state,
+                    # merged_at comes with the PR listing; is_merged() would cost a request per PR
+                    'merged': pr.merged_at is not None
+                }
+                if not self._put_row(rows, stop, row):
+                    return
+        except Exception as e:
+            print(f"Failed to retrieve PRs from {full_name}: {e}")
+        finally:
+            self._put_row(rows, stop, None)
+
+    def collect_pull_requests(
+        self,
+        repos: list[dict]=None,
+        output_path: str = "prs.parquet",
+        batch_size: int = 1000,
+        max_workers: int = 10
+    ) -> str:
         """
         Collects pull request titles and descriptions from each repository.
-        Returns a DataFrame with: repo_full_name, pr_number, title, body, author, created_at, state, merged
+        Up to `max_workers` repos are fetched at once. Their PRs go through a bounded queue
+        and are written to a Parquet file in batches of `batch_size` rows, so memory stays
+        bounded however many PRs there are. Returns the path of that file, with
+        columns: repo_full_name, pr_number, title, body, author, created_at, state, merged
         """
-        data = []
         if repos is None:
             repos = self.repos
-        for repo in repos:
+        # Workers block once the queue is full, until this thread has written a batch
+        rows = queue.Queue(maxsize=2 * batch_size)
+        stop = threading.Event()
+        batch = []
+        with pq.ParquetWriter(output_path, _PR_SCHEMA) as writer, ThreadPoolExecutor(max_workers=max_workers) as ex:
             try:
-                pulls = repo.get_pulls(state='all', sort='created', direction='desc')
-                print(f"Collecting PRs from {repo.full_name}, total PR's: {pulls.totalCount}")
-                for pr in pulls:
-                    data.append({
-                        'repo_full_name': repo.full_name,
-                        'pr_number': pr.number,
-                        'title': pr.title,
-                        'body': pr.body or '',
-                        'author': pr.user.login if pr.user else 'unknown',
-                        'created_at': pr.created_at,
-                        'state': pr.state,
-                        'merged': pr.is_merged()
-                    })
-            except Exception as e:
-                print(f"Failed to retrieve PRs from {repo.full_name}: {e}")
-        return pd.DataFrame(data)
+                for repo in repos:
+                    ex.submit(self._fetch_pull_requests, repo["nameWithOwner"], rows, stop)
+                remaining = len(repos)
+                while remaining:
+                    row = rows.get()
+                    if row is None:
+                        remaining -= 1
+                        continue
+                    batch.append(row)
+                    if len(batch) >= batch_size:
+                        writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=_PR_SCHEMA))
+                        batch = []
+                if batch:
+                    writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=_PR_SCHEMA))
+            except BaseException:
+                # Nothing drains the queue any more: release blocked workers and drop queued repos,
+                # so leaving the executor does not wait forever
+                stop.set()
+                ex.shutdown(wait=False, cancel_futures=True)
+                raise
+        return output_path
 
     def run(
         self,